@@ -1,35 +1,75 @@
 """Simple activation script for Auditor Agent"""
 import sys
 import os
-import argparse
+import functools
+import threading
+import traceback
 from pathlib import Path
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# Resolved once at import; everything below derives from these
+_HERE = Path(__file__).resolve().parent
+_BASE_DIR = _HERE.parent
 
 # Add current directory to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-base_dir = Path(current_dir).parent
-sys.path.insert(0, current_dir)
-sys.path.insert(0, str(base_dir / "ttp-master"))
+sys.path.insert(0, str(_HERE))
+sys.path.insert(0, str(_BASE_DIR / "ttp-master"))
 
 from auditor import audit_report, AuditorAgent
 
-# Import TTP Master (handle import error gracefully)
-TTP_MASTER_AVAILABLE = False
-analyze_ttp_report = None
-try:
-    import importlib.util
-    ttp_master_dir = base_dir / "ttp-master"
-    ttp_agent_path = ttp_master_dir / "agent.py"
-    if ttp_agent_path.exists():
+# TTP Master is loaded lazily (see _load_ttp_master); only probe for it here
+ttp_agent_path = _BASE_DIR / "ttp-master" / "agent.py"
+TTP_MASTER_AVAILABLE = ttp_agent_path.exists()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_ttp_master():
+    """Load TTP Master's analyze_report on first use, or None if it can't be imported"""
+    if not TTP_MASTER_AVAILABLE:
+        return None
+    try:
+        import importlib.util
         spec = importlib.util.spec_from_file_location("ttp_master_agent", ttp_agent_path)
         ttp_master_module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(ttp_master_module)
-        analyze_ttp_report = ttp_master_module.analyze_report
-        TTP_MASTER_AVAILABLE = True
-except Exception:
-    TTP_MASTER_AVAILABLE = False
+        return ttp_master_module.analyze_report
+    except Exception:
+        return None
 
+# Upper bound on how long to wait for a TTP Master run started alongside the audit
+TTP_MASTER_TIMEOUT_SECONDS = 600
 
-def run(run_id: str = None, red_team_logs_dir: str = None, save_report: bool = True):
+
+def _start_ttp_master(analyze_ttp_report, report_dir: Path) -> Future:
+    """
+    Start a quiet TTP Master run on a daemon thread and return its Future.
+    
+    The thread never keeps the process alive, so callers can stop waiting
+    (timeout or audit failure) and exit. Cancelling the Future before the
+    thread picks it up skips the run entirely.
+    """
+    future = Future()
+    
+    def _worker():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = analyze_ttp_report(
+                report_path=str(report_dir),
+                model=None,  # Use default model
+                verbose=False
+            )
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+    
+    threading.Thread(target=_worker, name="ttp-master", daemon=True).start()
+    return future
+
+
+def run(run_id: str = None, red_team_logs_dir: str = None, save_report: bool = True,
+        interactive: bool = True):
     """
     Run the auditor agent
     
@@ -37,6 +77,8 @@ def run(run_id: str = None, red_team_logs_dir: str = None, save_report: bool = T
         run_id: The run ID to audit (e.g., "1763830815685")
         red_team_logs_dir: Optional directory containing red-team logs
         save_report: If True, save the audit report to a file
+        interactive: If True, prompt user to validate the detected vulnerability.
+            When False, TTP Master runs concurrently with the audit.
     """
     if not run_id:
         print("❌ Error: Run ID is required")
@@ -47,71 +89,98 @@ def run(run_id: str = None, red_team_logs_dir: str = None, save_report: bool = T
     print(f"\n🔍 Auditing Run ID: {run_id}")
     print("─" * 60)
     
+    # Find the report directory
+    if red_team_logs_dir:
+        report_dir = Path(red_team_logs_dir) / f"run_{run_id}"
+    else:
+        report_dir = _BASE_DIR / "red-team-agent" / "logs" / f"run_{run_id}"
+    
+    # TTP Master only needs the red-team report, so start it alongside the audit.
+    # The overlapped run is quiet (its summary prints under the TTP MASTER header)
+    # and is abandoned if the audit fails; interactive audits still run it afterwards.
+    analyze_ttp_report = _load_ttp_master()
+    ttp_future = None
+    if analyze_ttp_report is not None and not interactive and report_dir.exists():
+        ttp_future = _start_ttp_master(analyze_ttp_report, report_dir)
+    
     try:
-        # Create auditor and audit (with interactive mode for user validation)
+        # Create auditor and audit
         auditor = AuditorAgent(red_team_logs_dir=red_team_logs_dir)
-        audit_result = auditor.audit(run_id, interactive=True)
+        audit_result = auditor.audit(run_id, interactive=interactive)
         
         # Check for errors
         if audit_result.get("status") == "error":
             print(f"\n❌ Error: {audit_result.get('error', 'Unknown error')}")
             sys.exit(1)
         
-        # Generate and print report
+        # Generate and print report (encoded once, shared by stdout and the .md file)
         report_text = auditor.generate_report(audit_result)
-        print("\n" + report_text)
+        encoded_report = report_text.encode("utf-8")
+        stdout_buffer = getattr(sys.stdout, "buffer", None)
+        if stdout_buffer is not None:
+            sys.stdout.flush()
+            stdout_buffer.write(b"\n" + encoded_report + b"\n")
+            stdout_buffer.flush()
+        else:
+            print("\n" + report_text)
         
         # Save report if requested
         if save_report:
             # Create auditor logs directory
-            base_dir = Path(__file__).parent.parent
-            auditor_logs_dir = base_dir / "auditor" / "logs"
+            auditor_logs_dir = _HERE / "logs"
             auditor_logs_dir.mkdir(exist_ok=True, parents=True)
             
             # Save report
             report_file = auditor_logs_dir / f"audit_{run_id}.md"
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write(report_text)
+            report_file.write_bytes(encoded_report)
             
             # Save JSON
-            import json
+            try:
+                import orjson
+            except ImportError:
+                orjson = None
             json_file = auditor_logs_dir / f"audit_{run_id}.json"
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(audit_result, f, indent=2, ensure_ascii=False)
+            if orjson is None:
+                import json
+                with open(json_file, 'w', encoding='utf-8') as f:
+                    json.dump(audit_result, f, indent=2, ensure_ascii=False)
+            else:
+                json_file.write_bytes(
+                    orjson.dumps(audit_result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                )
             
-        print(f"\n📄 Reports saved:")
-        print(f"  - {report_file}")
-        print(f"  - {json_file}")
+            print(f"\n📄 Reports saved:")
+            print(f"  - {report_file}")
+            print(f"  - {json_file}")
         
         # Step 3: Run TTP Master Agent
-        if TTP_MASTER_AVAILABLE:
+        if analyze_ttp_report is not None:
             print("\n" + "─" * 60)
             print("🎯 TTP MASTER AGENT")
             print("─" * 60)
             
             try:
-                # Find the report directory
-                if red_team_logs_dir:
-                    report_dir = Path(red_team_logs_dir) / f"run_{run_id}"
-                else:
-                    report_dir = base_dir / "red-team-agent" / "logs" / f"run_{run_id}"
-                
-                if report_dir.exists():
+                if ttp_future is not None:
+                    ttp_result = ttp_future.result(timeout=TTP_MASTER_TIMEOUT_SECONDS)
+                elif report_dir.exists():
                     ttp_result = analyze_ttp_report(
                         report_path=str(report_dir),
                         model=None,  # Use default model
                         verbose=True
                     )
-                    
-                    if ttp_result:
-                        ttp_count = len(ttp_result.get("structured_ttps", {}).get("techniques", []))
-                        print(f"\n✅ TTP Master: Identified {ttp_count} MITRE ATT&CK TTPs")
                 else:
+                    ttp_result = None
                     print(f"\n⚠️  Warning: Report directory not found: {report_dir}")
+                
+                if ttp_result:
+                    ttp_count = len(ttp_result.get("structured_ttps", {}).get("techniques", []))
+                    print(f"\n✅ TTP Master: Identified {ttp_count} MITRE ATT&CK TTPs")
+            except FutureTimeoutError:
+                print(f"\n⚠️  TTP Master timed out after {TTP_MASTER_TIMEOUT_SECONDS}s")
             except Exception as e:
                 print(f"\n⚠️  TTP Master Agent failed: {e}")
-                import traceback
-                traceback.print_exc()
+                if os.environ.get("CANARY_DEBUG"):
+                    traceback.print_exc()
         
         print("\n" + "─" * 60 + "\n")
         
@@ -125,12 +194,20 @@ def run(run_id: str = None, red_team_logs_dir: str = None, save_report: bool = T
         sys.exit(1)
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("CANARY_DEBUG"):
+            traceback.print_exc()
         sys.exit(1)
+    finally:
+        # Don't wait on TTP Master once the audit is done or has failed
+        if ttp_future is not None:
+            ttp_future.cancel()
 
 
-if __name__ == "__main__":
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Build the command-line parser (cached so repeated callers share one instance)"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Auditor Agent - Compare red-team findings to actual vulnerabilities",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -138,6 +215,7 @@ if __name__ == "__main__":
 Examples:
   python activate.py 1763830815685                    # Audit a specific run
   python activate.py 1763830815685 --no-save          # Don't save report to file
+  python activate.py 1763830815685 --non-interactive  # No prompts, run TTP Master concurrently
         """
     )
     
@@ -155,14 +233,24 @@ Examples:
         action="store_true",
         help="Don't save the audit report to a file"
     )
+    parser.add_argument(
+        "--non-interactive",
+        action="store_true",
+        help="Don't prompt for vulnerability confirmation; run TTP Master alongside the audit"
+    )
     
-    args = parser.parse_args()
+    return parser
+
+
+if __name__ == "__main__":
+    args = _build_parser().parse_args()
     
     try:
         run(
             run_id=args.run_id,
             red_team_logs_dir=args.red_team_logs_dir,
-            save_report=not args.no_save
+            save_report=not args.no_save,
+            interactive=not args.non_interactive
         )
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
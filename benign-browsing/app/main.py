@@ -4,8 +4,6 @@ import asyncio
 import os
 import sys
 import argparse
-from dotenv import load_dotenv
-from browser_use import Agent, ChatOpenAI
 
 def main():
     parser = argparse.ArgumentParser()
@@ -15,6 +13,7 @@ def main():
 
     # Load .env if running locally
     if os.path.exists('.env'):
+        from dotenv import load_dotenv
         load_dotenv()
 
     # Get values from args, fallback to env vars, then to defaults
@@ -35,6 +34,9 @@ def main():
     print(f"   URL: {url}")
     print(f"   Model: {model}")
 
+    # Imported only once the config is valid: browser_use is slow to load
+    from browser_use import Agent, ChatOpenAI
+
     llm = ChatOpenAI(
         model=model,
         base_url='https://openrouter.ai/api/v1',
@@ -1,43 +1,218 @@
 """Advanced risk forecasting with statistical analysis and transparency"""
 from app.models import Attack
+from bisect import bisect_right
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+import math
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import numpy as np
-import pandas as pd
-from scipy import stats
 from scipy.stats import poisson
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-import warnings
-warnings.filterwarnings('ignore')
+
+# Optional numba JIT for the smoothing and Poisson kernels (falls back to plain Python)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Trend momentum by recent/previous attack-rate ratio: below 0.6, below 0.8, up to
+# 1.0, above 1.0, above 1.2, above 1.5. The "above" cut-offs are nudged to the next
+# float so bisect_right keeps each boundary value in the lower bucket.
+_TREND_THRESH = (0.6, 0.8, math.nextafter(1.0, math.inf), math.nextafter(1.2, math.inf), math.nextafter(1.5, math.inf))
+_TREND_MOM = (0.25, 0.4, 0.5, 0.6, 0.75, 1.0)
+_TREND_DIR = ("decreasing", "decreasing", "stable", "increasing", "increasing", "increasing")
+
+
+class MethodResult(NamedTuple):
+    """One projection method's output within project_attacks"""
+    name: str
+    prediction: int
+    weight: float
+    r_squared: Optional[float] = None
+    confidence_interval: Optional[Dict[str, int]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The methods_applied entry reported for this method"""
+        entry = {"method": self.name, "prediction": self.prediction}
+        if self.confidence_interval is not None:
+            entry["confidence_interval"] = self.confidence_interval
+        if self.r_squared is not None:
+            entry["r_squared"] = self.r_squared
+        entry["weight"] = self.weight
+        return entry
+
+
+def _clamp(value: float, lo: float, hi: float) -> float:
+    """value limited to [lo, hi]"""
+    return lo if value < lo else hi if value > hi else value
+
+
+def _saturation(value: float, cap: float) -> float:
+    """value / cap, capped at 1.0 (no division once value reaches cap)"""
+    return 1.0 if value >= cap else value / cap
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+_US_PER_HOUR = 3_600_000_000
+_US_PER_DAY = 24 * _US_PER_HOUR
+
+
+def _normalize_datetime(dt: datetime) -> datetime:
+    """Treat naive timestamps as UTC"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _attacks_to_soa(attacks: List[Attack]) -> Dict[str, np.ndarray]:
+    """
+    Split attacks into parallel arrays, one per field
+    
+    "ts_us" holds exact epoch microseconds (naive timestamps read as UTC), so
+    filters over the attacks become integer mask arithmetic instead of a Python
+    pass per filter.
+    """
+    count = len(attacks)
+    return {
+        "ts_us": np.fromiter(((_normalize_datetime(a.timestamp) - _EPOCH) // _ONE_US for a in attacks), dtype=np.int64, count=count),
+        "success": np.fromiter((a.success for a in attacks), dtype=np.bool_, count=count),
+        "vuln": np.array([a.vulnerability_type for a in attacks], dtype=object),
+        "url": np.array([a.website_url for a in attacks], dtype=object),
+    }
+
+
+def _to_hourly_arrays(ts_us: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bucket epoch-microsecond timestamps into UTC hours
+    
+    Returns (hours, counts) for the hours that saw at least one attack, in order:
+    hours are float offsets from the first such hour, counts the attacks in each.
+    """
+    hour_idx = ts_us // _US_PER_HOUR
+    occupied, counts = np.unique(hour_idx, return_counts=True)
+    return (occupied - occupied[0]).astype(np.float64), counts
+
+
+def _linear_fit(x: np.ndarray, y: np.ndarray) -> Tuple[float, float, float]:
+    """Ordinary least-squares line through (x, y): (slope, intercept, r_squared)"""
+    x_mean = x.mean()
+    y_mean = y.mean()
+    x_centered = x - x_mean
+    y_centered = y - y_mean
+    slope = (x_centered @ y_centered) / (x_centered @ x_centered)
+    intercept = y_mean - slope * x_mean
+    ss_res = ((y - (slope * x + intercept)) ** 2).sum()
+    ss_tot = (y_centered ** 2).sum()
+    # Like sklearn's score: a constant y scores 1.0 only when fitted exactly
+    r_squared = 1 - ss_res / ss_tot if ss_tot else float(ss_res == 0)
+    return float(slope), float(intercept), float(r_squared)
+
+
+@lru_cache(maxsize=32)
+def _ema_weights(n: int) -> np.ndarray:
+    """Normalized exponential weights over n points, most recent highest (read-only, shared)"""
+    weights = np.exp(np.linspace(-1, 0, n))
+    weights = weights / weights.sum()
+    weights.setflags(write=False)
+    return weights
+
+
+@lru_cache(maxsize=16)
+def _horizon_steps(hours: int) -> np.ndarray:
+    """1.0 .. hours as floats, the offsets of each projected hour (read-only, shared)"""
+    steps = np.arange(1, hours + 1, dtype=np.float64)
+    steps.setflags(write=False)
+    return steps
+
+
+def _poisson_fit(x: np.ndarray, y: np.ndarray, alpha: float, max_iter: int) -> Tuple[float, float]:
+    """
+    Poisson regression of y on x with a log link: (intercept, slope)
+    
+    Minimizes the same objective as sklearn's PoissonRegressor, mean half-deviance
+    plus alpha/2 * slope**2, with Newton steps halved whenever they overshoot.
+    """
+    b0 = np.log(y.mean())
+    b1 = 0.0
+    objective = (np.exp(b0) - y * b0).mean()
+    for _ in range(max_iter):
+        mu = np.exp(b0 + b1 * x)
+        residual = mu - y
+        g0 = residual.mean()
+        g1 = (residual * x).mean() + alpha * b1
+        h00 = mu.mean()
+        h01 = (mu * x).mean()
+        h11 = (mu * x * x).mean() + alpha
+        det = h00 * h11 - h01 * h01
+        d0 = (h11 * g0 - h01 * g1) / det
+        d1 = (h00 * g1 - h01 * g0) / det
+        
+        step = 1.0
+        while True:
+            eta = (b0 - step * d0) + (b1 - step * d1) * x
+            new_objective = (np.exp(eta) - y * eta).mean() + 0.5 * alpha * (b1 - step * d1) ** 2
+            if new_objective <= objective or step < 1e-10:
+                break
+            step *= 0.5
+        b0 -= step * d0
+        b1 -= step * d1
+        objective = new_objective
+        if abs(step * d0) < 1e-12 and abs(step * d1) < 1e-12:
+            break
+    return b0, b1
+
+
+def _holt_forecast(x: np.ndarray, alpha: float, beta: float, horizon: int) -> float:
+    """Holt's linear smoothing over x, extrapolated horizon steps ahead (floored at 0)"""
+    smooth = x[0]
+    trend = 0.0
+    for i in range(1, x.size):
+        prev_smooth = smooth
+        smooth = alpha * x[i] + (1 - alpha) * (prev_smooth + trend)
+        trend = beta * (smooth - prev_smooth) + (1 - beta) * trend
+    return max(0.0, smooth + trend * horizon)
+
+
+if njit is not None:
+    _holt_forecast = njit(cache=True)(_holt_forecast)
+    _poisson_fit = njit(cache=True)(_poisson_fit)
+
+
+# How the scores and projections are computed, reported alongside them (read-only)
+_METHODOLOGY = {
+    "risk_score": {
+        "method": "Multi-factor weighted scoring",
+        "factors": {
+            "attack_frequency": {"weight": 0.35, "description": "Number of attacks in time window (normalized to max expected)"},
+            "success_rate": {"weight": 0.30, "description": "Percentage of successful attacks"},
+            "vulnerability_diversity": {"weight": 0.20, "description": "Number of unique vulnerability types (diversity = more risk)"},
+            "trend_momentum": {"weight": 0.15, "description": "Rate of change in attack frequency (increasing = higher risk)"}
+        },
+        "normalization": "All factors normalized 0-1, then weighted and scaled to 0-100"
+    },
+    "projection": {
+        "method": "Ensemble of statistical methods",
+        "methods_used": {
+            "exponential_smoothing": {"weight": 0.4, "description": "Holt-Winters exponential smoothing for trend and seasonality"},
+            "poisson_regression": {"weight": 0.3, "description": "Poisson regression for count-based attack prediction"},
+            "moving_average": {"weight": 0.2, "description": "Weighted moving average (recent data weighted higher)"},
+            "trend_extrapolation": {"weight": 0.1, "description": "Linear trend extrapolation for long-term patterns"}
+        },
+        "confidence": "Based on model R², data volume, and historical prediction accuracy"
+    }
+}
 
 
 class AdvancedRiskForecaster:
     """Advanced risk forecasting with statistical rigor and transparency"""
     
+    methodology = _METHODOLOGY
+    
+    # Projections kept per (attacks signature, horizon, method), oldest evicted first
+    PROJECTION_CACHE_SIZE = 16
+    
     def __init__(self):
-        self.methodology = {
-            "risk_score": {
-                "method": "Multi-factor weighted scoring",
-                "factors": {
-                    "attack_frequency": {"weight": 0.35, "description": "Number of attacks in time window (normalized to max expected)"},
-                    "success_rate": {"weight": 0.30, "description": "Percentage of successful attacks"},
-                    "vulnerability_diversity": {"weight": 0.20, "description": "Number of unique vulnerability types (diversity = more risk)"},
-                    "trend_momentum": {"weight": 0.15, "description": "Rate of change in attack frequency (increasing = higher risk)"}
-                },
-                "normalization": "All factors normalized 0-1, then weighted and scaled to 0-100"
-            },
-            "projection": {
-                "method": "Ensemble of statistical methods",
-                "methods_used": {
-                    "exponential_smoothing": {"weight": 0.4, "description": "Holt-Winters exponential smoothing for trend and seasonality"},
-                    "poisson_regression": {"weight": 0.3, "description": "Poisson regression for count-based attack prediction"},
-                    "moving_average": {"weight": 0.2, "description": "Weighted moving average (recent data weighted higher)"},
-                    "trend_extrapolation": {"weight": 0.1, "description": "Linear trend extrapolation for long-term patterns"}
-                },
-                "confidence": "Based on model R², data volume, and historical prediction accuracy"
-            }
-        }
+        self._projection_cache: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
     
     def calculate_risk_score(
         self, 
@@ -62,18 +237,15 @@ class AdvancedRiskForecaster:
         
         now = datetime.now(timezone.utc)
         
-        # Filter to time window
-        def normalize_datetime(dt):
-            if dt.tzinfo is None:
-                return dt.replace(tzinfo=timezone.utc)
-            return dt
+        # Whole days since each attack, floored like timedelta.days
+        soa = _attacks_to_soa(attacks)
+        days = ((now - _EPOCH) // _ONE_US - soa["ts_us"]) // _US_PER_DAY
         
-        recent_attacks = [
-            a for a in attacks 
-            if (now - normalize_datetime(a.timestamp)).days <= time_window_days
-        ]
+        # Filter to time window
+        recent = days <= time_window_days
+        attack_count = int(recent.sum())
         
-        if not recent_attacks:
+        if not attack_count:
             return {
                 "risk_score": 0.0,
                 "components": {},
@@ -82,55 +254,43 @@ class AdvancedRiskForecaster:
             }
         
         # Factor 1: Attack Frequency (0-1 normalized)
-        attack_count = len(recent_attacks)
         # Expected max: 200 attacks/week for high-risk threshold
-        frequency_score = min(attack_count / 200.0, 1.0)
+        frequency_score = _saturation(attack_count, 200.0)
         
         # Factor 2: Success Rate (0-1)
-        successful_attacks = sum(1 for a in recent_attacks if a.success)
-        success_rate = successful_attacks / attack_count if attack_count > 0 else 0
+        successful_attacks = int(soa["success"][recent].sum())
+        success_rate = successful_attacks / attack_count
         
         # Factor 3: Vulnerability Diversity (0-1 normalized)
-        unique_vulns = len(set(a.vulnerability_type for a in recent_attacks))
-        unique_websites = len(set(a.website_url for a in recent_attacks))
+        if attack_count == 1:
+            unique_vulns = unique_websites = 1
+        else:
+            # Hash the object arrays: np.unique would sort them with Python comparisons
+            unique_vulns = len(set(soa["vuln"][recent]))
+            unique_websites = len(set(soa["url"][recent]))
         # Expected max: 15 unique vulnerability types for normalization
-        diversity_score = min(unique_vulns / 15.0, 1.0)
+        diversity_score = _saturation(unique_vulns, 15.0)
         
         # Factor 4: Trend Momentum (0-1)
         # Compare last 3 days vs previous 4 days
-        def days_ago(timestamp):
-            ts = normalize_datetime(timestamp)
-            return (now - ts).days
-        
-        last_3d = [a for a in recent_attacks if days_ago(a.timestamp) <= 3]
-        prev_4d = [a for a in recent_attacks if 3 < days_ago(a.timestamp) <= 7]
+        recent_days = days[recent]
+        last_3d = int((recent_days <= 3).sum())
+        prev_4d = int(((recent_days > 3) & (recent_days <= 7)).sum())
         
         trend_momentum = 0.5  # Neutral default
         trend_direction = "stable"
         trend_ratio = 1.0
         
-        if len(prev_4d) > 0:
-            recent_rate = len(last_3d) / 3.0 if len(last_3d) > 0 else 0
-            prev_rate = len(prev_4d) / 4.0
+        if prev_4d > 0:
+            recent_rate = last_3d / 3.0
+            prev_rate = prev_4d / 4.0
             
             if prev_rate > 0:
                 trend_ratio = recent_rate / prev_rate
-                if trend_ratio > 1.5:
-                    trend_momentum = 1.0
-                    trend_direction = "increasing"
-                elif trend_ratio > 1.2:
-                    trend_momentum = 0.75
-                    trend_direction = "increasing"
-                elif trend_ratio > 1.0:
-                    trend_momentum = 0.6
-                    trend_direction = "increasing"
-                elif trend_ratio < 0.6:
-                    trend_momentum = 0.25
-                    trend_direction = "decreasing"
-                elif trend_ratio < 0.8:
-                    trend_momentum = 0.4
-                    trend_direction = "decreasing"
-        elif len(last_3d) > 0 and len(prev_4d) == 0:
+                bucket = bisect_right(_TREND_THRESH, trend_ratio)
+                trend_momentum = _TREND_MOM[bucket]
+                trend_direction = _TREND_DIR[bucket]
+        elif last_3d > 0:
             # New activity detected
             trend_momentum = 0.8
             trend_direction = "increasing"
@@ -144,7 +304,11 @@ class AdvancedRiskForecaster:
             trend_momentum * weights["trend_momentum"]["weight"]
         ) * 100
         
-        risk_score = min(max(risk_score, 0.0), 100.0)
+        risk_score = _clamp(risk_score, 0.0, 100.0)
+        
+        recent_idx = np.flatnonzero(recent)
+        oldest = recent_idx[np.argmin(soa["ts_us"][recent_idx])]
+        newest = recent_idx[np.argmax(soa["ts_us"][recent_idx])]
         
         return {
             "risk_score": risk_score,
@@ -176,18 +340,18 @@ class AdvancedRiskForecaster:
                     "weight": weights["trend_momentum"]["weight"],
                     "contribution": trend_momentum * weights["trend_momentum"]["weight"] * 100,
                     "direction": trend_direction,
-                    "recent_3d": len(last_3d),
-                    "prev_4d": len(prev_4d)
+                    "recent_3d": last_3d,
+                    "prev_4d": prev_4d
                 }
             },
             "methodology": self.methodology["risk_score"],
             "data_quality": {
                 "sufficient": True,
                 "time_window_days": time_window_days,
-                "data_points": len(recent_attacks),
+                "data_points": attack_count,
                 "date_range": {
-                    "oldest": min(normalize_datetime(a.timestamp) for a in recent_attacks).isoformat(),
-                    "newest": max(normalize_datetime(a.timestamp) for a in recent_attacks).isoformat()
+                    "oldest": _normalize_datetime(attacks[oldest].timestamp).isoformat(),
+                    "newest": _normalize_datetime(attacks[newest].timestamp).isoformat()
                 }
             }
         }
@@ -208,7 +372,27 @@ class AdvancedRiskForecaster:
         
         Returns:
             Dict with predictions, confidence intervals, and methodology details
+            (shared with later calls for the same attacks, so don't mutate it)
         """
+        # Log rows are append-only, so id/timestamp/success pin down the input
+        key = (tuple((a.id, a.timestamp, a.success) for a in attacks), time_horizon_hours, method)
+        cached = self._projection_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self._project_attacks(attacks, time_horizon_hours, method)
+        if len(self._projection_cache) >= self.PROJECTION_CACHE_SIZE:
+            del self._projection_cache[next(iter(self._projection_cache))]
+        self._projection_cache[key] = result
+        return result
+    
+    def _project_attacks(
+        self, 
+        attacks: List[Attack], 
+        time_horizon_hours: int,
+        method: str
+    ) -> Dict[str, Any]:
+        """Uncached project_attacks"""
         if not attacks or len(attacks) < 5:
             return {
                 "predicted_attacks": 0,
@@ -218,32 +402,16 @@ class AdvancedRiskForecaster:
                 "data_quality": {"sufficient": False, "reason": "Insufficient data points"}
             }
         
-        # Convert to DataFrame
-        df = pd.DataFrame([{
-            'timestamp': a.timestamp,
-            'success': 1 if a.success else 0,
-            'technique_id': a.technique_id,
-            'website_url': a.website_url
-        } for a in attacks])
-        
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        if df['timestamp'].dt.tz is None:
-            df['timestamp'] = df['timestamp'].dt.tz_localize('UTC')
-        
-        df = df.sort_values('timestamp')
-        
-        # Resample to hourly
-        df['hour'] = df['timestamp'].dt.floor('H')
-        hourly_counts = df.groupby('hour').size().reset_index(name='count')
-        hourly_success = df.groupby('hour')['success'].sum().reset_index(name='successful')
-        hourly = hourly_counts.merge(hourly_success, on='hour', how='left')
-        hourly['successful'] = hourly['successful'].fillna(0)
+        # Split into arrays and resample to hourly
+        soa = _attacks_to_soa(attacks)
+        ts_us = soa["ts_us"]
+        hours, counts = _to_hourly_arrays(ts_us)
         
-        if len(hourly) < 3:
+        if counts.size < 3:
             # Fallback: simple average
-            avg_rate = len(df) / max((df['timestamp'].max() - df['timestamp'].min()).total_seconds() / 3600, 1)
+            avg_rate = len(ts_us) / max((ts_us.max() - ts_us.min()) / 1e6 / 3600, 1)
             predicted = int(avg_rate * time_horizon_hours)
-            success_rate = df['success'].mean() if len(df) > 0 else 0
+            success_rate = soa["success"].mean()
             
             return {
                 "predicted_attacks": predicted,
@@ -254,159 +422,85 @@ class AdvancedRiskForecaster:
                 "data_quality": {"sufficient": False}
             }
         
-        predictions = []
-        methods_used = []
+        methods_used: List[MethodResult] = []
+        lin_fit = None  # (slope, intercept, r_squared) of counts over hours, fitted once
+        trend_slope = None  # Slope of the last model fitted below
         
+        last_hour = hours[-1]
+        future_hours = last_hour + _horizon_steps(time_horizon_hours)
+        
+        # Every method below is well-defined from here on: there are at least 3
+        # distinct hours, so the fits are never degenerate
         if method in ["ensemble", "exponential_smoothing"]:
             # Exponential Smoothing (Holt-Winters variant)
-            try:
-                alpha = 0.3  # Smoothing parameter
-                beta = 0.1   # Trend parameter
-                
-                # Simple exponential smoothing with trend
-                smoothed = []
-                trend = []
-                
-                smoothed.append(hourly['count'].iloc[0])
-                trend.append(0)
-                
-                for i in range(1, len(hourly)):
-                    prev_smooth = smoothed[-1]
-                    prev_trend = trend[-1]
-                    current = hourly['count'].iloc[i]
-                    
-                    new_smooth = alpha * current + (1 - alpha) * (prev_smooth + prev_trend)
-                    new_trend = beta * (new_smooth - prev_smooth) + (1 - beta) * prev_trend
-                    
-                    smoothed.append(new_smooth)
-                    trend.append(new_trend)
-                
-                # Forecast
-                last_smooth = smoothed[-1]
-                last_trend = trend[-1]
-                forecast_es = last_smooth + last_trend * time_horizon_hours
-                forecast_es = max(0, int(forecast_es))
-                
-                predictions.append(("exponential_smoothing", forecast_es))
-                methods_used.append({"method": "exponential_smoothing", "prediction": forecast_es, "weight": 0.4})
-            except Exception as e:
-                print(f"Exponential smoothing failed: {e}")
+            alpha = 0.3  # Smoothing parameter
+            beta = 0.1   # Trend parameter
+            
+            # Simple exponential smoothing with trend, then forecast
+            forecast_es = int(_holt_forecast(counts.astype(np.float64), alpha, beta, time_horizon_hours))
+            
+            methods_used.append(MethodResult("exponential_smoothing", forecast_es, 0.4))
         
         if method in ["ensemble", "poisson"]:
             # Poisson regression (appropriate for count data)
-            try:
-                hourly['hours_since_start'] = (hourly['hour'] - hourly['hour'].min()).dt.total_seconds() / 3600
-                X = hourly['hours_since_start'].values.reshape(-1, 1)
-                y = hourly['count'].values
-                
-                # Fit Poisson-like model (using log link)
-                # Fallback to LinearRegression if PoissonRegressor not available
-                use_log_transform = False
-                try:
-                    from sklearn.linear_model import PoissonRegressor
-                    model = PoissonRegressor(alpha=0.1, max_iter=200)
-                    model.fit(X, y)
-                except ImportError:
-                    # Use LinearRegression with log transform as approximation
-                    from sklearn.linear_model import LinearRegression
-                    y_log = np.log1p(y)  # log(1+y) to handle zeros
-                    model = LinearRegression()
-                    model.fit(X, y_log)
-                    # Store flag to use exp transform later
-                    use_log_transform = True
-                
-                last_hour = hourly['hours_since_start'].max()
-                future_hours = np.arange(last_hour + 1, last_hour + time_horizon_hours + 1).reshape(-1, 1)
-                
-                # Check if we used log transform
-                if use_log_transform:
-                    pred_log = model.predict(future_hours)
-                    pred_rates = np.expm1(pred_log)  # exp(x) - 1 to reverse log1p
-                else:
-                    pred_rates = model.predict(future_hours)
-                
-                pred_rates = np.maximum(pred_rates, 0)  # No negative rates
-                forecast_poisson = int(np.sum(pred_rates))
+            # Fit Poisson model (log link, L2 penalty 0.1 on the slope)
+            # Overshooting steps and steep extrapolations overflow exp; both are handled
+            with np.errstate(over='ignore'):
+                poisson_intercept, poisson_slope = _poisson_fit(hours, counts.astype(np.float64), 0.1, 200)
+                pred_rates = np.exp(poisson_intercept + poisson_slope * future_hours)
+            total_rate = np.sum(pred_rates)
+            
+            # The log link can blow up when extrapolating a steep series; past
+            # uint64 range the forecast is meaningless, so fall back to linear
+            if np.isfinite(total_rate) and total_rate < 2.0 ** 64:
+                trend_slope = poisson_slope
+                forecast_poisson = int(total_rate)
                 
                 # Calculate confidence interval (95%)
-                # For Poisson, CI ≈ prediction ± 1.96 * sqrt(prediction)
-                std_dev = np.sqrt(forecast_poisson)
-                ci_lower = max(0, int(forecast_poisson - 1.96 * std_dev))
-                ci_upper = int(forecast_poisson + 1.96 * std_dev)
+                # Exact Poisson quantiles; the normal approximation is skewed for small counts
+                ci_lower, ci_upper = poisson.interval(0.95, forecast_poisson)
+                ci_lower = int(ci_lower)
+                ci_upper = int(ci_upper)
                 
-                predictions.append(("poisson", forecast_poisson))
-                methods_used.append({
-                    "method": "poisson_regression",
-                    "prediction": forecast_poisson,
-                    "confidence_interval": {"lower": ci_lower, "upper": ci_upper},
-                    "weight": 0.3
-                })
-            except Exception as e:
-                print(f"Poisson regression failed: {e}")
-                # Fallback to linear if Poisson not available
-                try:
-                    from sklearn.linear_model import LinearRegression
-                    model = LinearRegression()
-                    model.fit(X, y)
-                    pred_linear = model.predict(future_hours)
-                    pred_linear = np.maximum(pred_linear, 0)
-                    forecast_linear = int(np.sum(pred_linear))
-                    predictions.append(("linear", forecast_linear))
-                    methods_used.append({"method": "linear_regression", "prediction": forecast_linear, "weight": 0.3})
-                except:
-                    pass
+                methods_used.append(MethodResult(
+                    "poisson_regression", forecast_poisson, 0.3,
+                    confidence_interval={"lower": ci_lower, "upper": ci_upper}
+                ))
+            else:
+                print(f"Poisson regression diverged (projected {total_rate}), using linear regression")
+                lin_fit = _linear_fit(hours, counts)
+                trend_slope, intercept, _ = lin_fit
+                pred_linear = np.maximum(trend_slope * future_hours + intercept, 0)
+                forecast_linear = int(np.sum(pred_linear))
+                methods_used.append(MethodResult("linear_regression", forecast_linear, 0.3))
         
         if method in ["ensemble", "moving_average"]:
             # Weighted moving average (recent data weighted more)
-            try:
-                window = min(24, len(hourly))  # Last 24 hours or all data
-                recent_counts = hourly['count'].tail(window).values
-                
-                # Exponential weights (more recent = higher weight)
-                weights = np.exp(np.linspace(-1, 0, len(recent_counts)))
-                weights = weights / weights.sum()
-                
-                weighted_avg = np.average(recent_counts, weights=weights)
-                forecast_ma = int(weighted_avg * time_horizon_hours)
-                
-                predictions.append(("moving_average", forecast_ma))
-                methods_used.append({"method": "weighted_moving_average", "prediction": forecast_ma, "weight": 0.2})
-            except Exception as e:
-                print(f"Moving average failed: {e}")
+            window = min(24, counts.size)  # Last 24 hours or all data
+            recent_counts = counts[-window:]
+            
+            # Exponential weights (more recent = higher weight)
+            weights = _ema_weights(len(recent_counts))
+            
+            weighted_avg = np.average(recent_counts, weights=weights)
+            forecast_ma = int(weighted_avg * time_horizon_hours)
+            
+            methods_used.append(MethodResult("weighted_moving_average", forecast_ma, 0.2))
         
         if method in ["ensemble", "trend"]:
             # Linear trend extrapolation
-            try:
-                hourly['hours_since_start'] = (hourly['hour'] - hourly['hour'].min()).dt.total_seconds() / 3600
-                X = hourly['hours_since_start'].values.reshape(-1, 1)
-                y = hourly['count'].values
-                
-                from sklearn.linear_model import LinearRegression
-                model = LinearRegression()
-                model.fit(X, y)
-                
-                last_hour = hourly['hours_since_start'].max()
-                future_hours = np.arange(last_hour + 1, last_hour + time_horizon_hours + 1).reshape(-1, 1)
-                pred_trend = model.predict(future_hours)
-                pred_trend = np.maximum(pred_trend, 0)
-                forecast_trend = int(np.sum(pred_trend))
-                
-                # Calculate R² for confidence
-                r2 = model.score(X, y)
-                
-                predictions.append(("trend", forecast_trend))
-                methods_used.append({
-                    "method": "trend_extrapolation",
-                    "prediction": forecast_trend,
-                    "r_squared": float(r2),
-                    "weight": 0.1
-                })
-            except Exception as e:
-                print(f"Trend extrapolation failed: {e}")
-        
-        if not predictions:
-            # All methods failed, use simple average
-            avg_rate = hourly['count'].mean()
+            if lin_fit is None:
+                lin_fit = _linear_fit(hours, counts)
+            trend_slope, intercept, r2 = lin_fit
+            
+            pred_trend = np.maximum(trend_slope * future_hours + intercept, 0)
+            forecast_trend = int(np.sum(pred_trend))
+            
+            methods_used.append(MethodResult("trend_extrapolation", forecast_trend, 0.1, r_squared=r2))
+        
+        if not methods_used:
+            # Unknown method, use simple average
+            avg_rate = counts.mean()
             forecast_simple = int(avg_rate * time_horizon_hours)
             return {
                 "predicted_attacks": forecast_simple,
@@ -417,46 +511,34 @@ class AdvancedRiskForecaster:
             }
         
         # Ensemble: Weighted average of all methods
-        if method == "ensemble" and len(predictions) > 1:
-            # Build weights map using method name (string) as key, not dict
-            weights_map = {
-                m.get("method", "unknown"): m.get("weight", 0.25)
-                for m in methods_used 
-                if isinstance(m, dict) and "weight" in m
-            }
-            total_weight = sum(m.get("weight", 0) for m in methods_used if isinstance(m, dict))
-            
-            if total_weight > 0:
-                weighted_pred = sum(
-                    pred * (m.get("weight", 0.25) / total_weight)
-                    for (method_name, pred), m in zip(predictions, methods_used)
-                    if isinstance(m, dict)
-                )
-            else:
-                weighted_pred = np.mean([pred for _, pred in predictions])
+        use_ensemble = method == "ensemble" and len(methods_used) > 1
+        if use_ensemble:
+            weights_map = {m.name: m.weight for m in methods_used}
+            total_weight = sum(m.weight for m in methods_used)
+            weighted_pred = sum(m.prediction * (m.weight / total_weight) for m in methods_used)
         else:
-            weighted_pred = predictions[0][1]
+            weighted_pred = methods_used[0].prediction
         
         predicted_attacks = max(0, int(weighted_pred))
         
         # Calculate success rate projection
-        success_rate = df['success'].mean() if len(df) > 0 else 0
+        success_rate = soa["success"].mean()
         predicted_successful = int(predicted_attacks * success_rate)
         
         # Confidence calculation
         # Based on: data volume, R² scores, prediction variance
-        data_volume_score = min(len(hourly) / 100.0, 1.0)
+        data_volume_score = _saturation(counts.size, 100.0)
         
         # Get R² from available methods
-        r2_scores = [m.get("r_squared", 0.7) for m in methods_used if isinstance(m, dict) and "r_squared" in m]
+        r2_scores = [m.r_squared for m in methods_used if m.r_squared is not None]
         avg_r2 = np.mean(r2_scores) if r2_scores else 0.7
         
         # Prediction variance (lower variance = higher confidence)
-        pred_values = [pred for _, pred in predictions]
+        pred_values = [m.prediction for m in methods_used]
         if len(pred_values) > 1:
             variance = np.var(pred_values)
             max_pred = max(pred_values)
-            consistency_score = 1.0 - min(variance / (max_pred ** 2), 1.0) if max_pred > 0 else 0.5
+            consistency_score = 1.0 - _saturation(variance, max_pred ** 2) if max_pred > 0 else 0.5
         else:
             consistency_score = 0.5
         
@@ -465,7 +547,7 @@ class AdvancedRiskForecaster:
             avg_r2 * 0.4 +
             consistency_score * 0.3
         )
-        confidence = min(max(confidence, 0.0), 1.0)
+        confidence = _clamp(confidence, 0.0, 1.0)
         
         # Prediction range (confidence interval)
         if len(pred_values) > 1:
@@ -482,6 +564,12 @@ class AdvancedRiskForecaster:
                 "upper": int(predicted_attacks * 1.3)
             }
         
+        # Historical statistics: std reuses the mean instead of recomputing it
+        # (sample std, ddof=1, matching the pandas Series.std it replaced)
+        hist_mean = counts.mean()
+        hist_std = np.sqrt(np.square(counts - hist_mean).sum() / (counts.size - 1))
+        span_hours = float(hours[-1])
+        
         return {
             "predicted_attacks": predicted_attacks,
             "predicted_successful": predicted_successful,
@@ -489,21 +577,21 @@ class AdvancedRiskForecaster:
             "confidence": confidence,
             "methodology": {
                 **self.methodology["projection"],
-                "methods_applied": methods_used,
-                "ensemble_weights": weights_map if method == "ensemble" and len(predictions) > 1 else {}
+                "methods_applied": [m.to_dict() for m in methods_used],
+                "ensemble_weights": weights_map if use_ensemble else {}
             },
             "statistics": {
-                "historical_mean": float(hourly['count'].mean()) if not np.isnan(hourly['count'].mean()) else 0.0,
-                "historical_std": float(hourly['count'].std()) if not np.isnan(hourly['count'].std()) else 0.0,
-                "historical_median": float(hourly['count'].median()) if not np.isnan(hourly['count'].median()) else 0.0,
-                "trend_slope": float(model.coef_[0]) if 'model' in locals() and hasattr(model, 'coef_') and not np.isnan(model.coef_[0]) else None,
-                "data_points": len(hourly),
-                "time_span_hours": float((hourly['hour'].max() - hourly['hour'].min()).total_seconds() / 3600) if len(hourly) > 1 else 0.0
+                "historical_mean": float(hist_mean),
+                "historical_std": float(hist_std),
+                "historical_median": float(np.median(counts)),
+                "trend_slope": float(trend_slope) if trend_slope is not None and not np.isnan(trend_slope) else None,
+                "data_points": counts.size,
+                "time_span_hours": span_hours
             },
             "data_quality": {
                 "sufficient": True,
-                "sample_size": len(hourly),
-                "time_coverage_hours": float((hourly['hour'].max() - hourly['hour'].min()).total_seconds() / 3600)
+                "sample_size": counts.size,
+                "time_coverage_hours": span_hours
             }
         }
 
@@ -1,10 +1,221 @@
 """Autonomous AI agent detection logic"""
 from app.models import Attack
 from app.schemas import AgentIndicators
-from app.database import supabase
+from app.database import query_db, query_prepared
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import List
-import statistics
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import threading
+import time
+import numpy as np
+
+
+# Score tiers: a mean gap below _SPEED_THRESH[i] (bisect_right), more than
+# _COORD_THRESH[i] similar sources or an overall score above
+# _OVERALL_THRESH[i] (bisect_left) moves up a tier. Each tier maps to its
+# score and the indicator strings it contributes.
+_SPEED_THRESH = (1.0, 5.0, 30.0)
+_SPEED_SCORE = (1.0, 0.7, 0.4, 0.0)
+_SPEED_INDICATORS = (
+    ("Extremely rapid attack sequence",),
+    ("Rapid attack sequence",),
+    ("Fast attack sequence",),
+    (),
+)
+_COORD_THRESH = (1, 3)
+_COORD_SCORE = (0.0, 0.4, 0.7)
+_COORD_INDICATORS = (
+    (),
+    ("Multiple sources with similar patterns",),
+    ("Coordinated multi-source attack pattern",),
+)
+_OVERALL_THRESH = (0.4, 0.7)
+_OVERALL_INDICATORS = (
+    (),
+    ("Moderate probability of autonomous agent",),
+    ("High probability of autonomous agent",),
+)
+# Indexed by (systematic exploration << 1) | multi-target; exploration
+# outscores multi-target when both are present
+_PATTERN_SCORE = (0.0, 0.6, 0.8, 0.8)
+_PATTERN_INDICATORS = (
+    (),
+    ("Multi-target systematic approach",),
+    ("Systematic vulnerability exploration",),
+    ("Systematic vulnerability exploration", "Multi-target systematic approach"),
+)
+_NO_INDICATORS = ("No strong agent indicators",)
+
+# Same-source window reduced to the scalars the scoring needs: the gaps come
+# from LAG over the timestamp-ordered window, so only one row is returned.
+# The similar-pattern source count rides along as a scalar subquery.
+# Both shapes run on every analyzed attack, so they are prepared statements:
+# $1 source, $2/$3 window bounds, $4/$5 vulnerability type and technique,
+# $6 whether the type is in HOT_VULN_SET. Postgres only runs the subquery
+# when the CASE reaches it, so lone probes skip the coordination scan.
+# The attack being analyzed has just been logged, so nothing newer than it
+# exists yet and the similar-pattern scan needs no upper bound; backfills go
+# through analyze_attacks, which keeps both bounds.
+_WINDOW_STATS_SQL = """
+    SELECT {sources} AS sources,
+           COUNT(*) AS attacks,
+           AVG(EXTRACT(EPOCH FROM gap)) AS avg_gap,
+           COUNT(DISTINCT vulnerability_type) AS unique_vulns,
+           COUNT(DISTINCT base_url) AS unique_sites
+    FROM (
+        SELECT vulnerability_type, base_url,
+               timestamp - LAG(timestamp) OVER (ORDER BY timestamp) AS gap
+        FROM vulnerability_logs
+        WHERE attacker_id = $1 AND timestamp BETWEEN $2 AND $3
+    ) recent
+"""
+_SIMILAR_SOURCES_SQL = """(
+        SELECT COUNT(DISTINCT NULLIF(attacker_id, ''))
+        FROM vulnerability_logs
+        WHERE vulnerability_type = $4 AND technique_id = $5 AND timestamp >= $2
+    )"""
+_WINDOW_SQL = _WINDOW_STATS_SQL.format(
+    sources=f"CASE WHEN $6 OR COUNT(*) > 1 THEN {_SIMILAR_SOURCES_SQL} END"
+)
+_RECENT_ONLY_SQL = _WINDOW_STATS_SQL.format(sources="NULL")
+
+# A source with at most one attack in its window has no speed or pattern
+# signal, so coordination is only checked for it on these vulnerability
+# types: credential use and key guessing, where spreading attempts across
+# sources is itself the signal.
+HOT_VULN_SET = frozenset({
+    "admin-page-access-correct-api-key",
+    "admin-page-access-incorrect-api-key",
+})
+
+# Distinct source count for a (vulnerability_type, technique_id) pattern.
+# Every attack in a burst asks the same question, so answers are reused for
+# SIMILAR_SOURCES_TTL seconds, keyed on the attack time bucketed to that TTL.
+SIMILAR_SOURCES_TTL = 20
+SIMILAR_SOURCES_CACHE_SIZE = 1024
+_similar_sources_cache: Dict[Tuple[str, str, int], Tuple[float, int]] = {}
+_similar_sources_lock = threading.RLock()
+
+
+def _cached_similar_sources(key: Tuple[str, str, int]) -> Optional[int]:
+    """Return the cached source count for a pattern bucket, or None once expired"""
+    with _similar_sources_lock:
+        entry = _similar_sources_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _similar_sources_cache[key]
+            return None
+        return entry[1]
+
+
+def _store_similar_sources(key: Tuple[str, str, int], sources: int) -> None:
+    """Cache the source count for a pattern bucket, evicting the oldest when full"""
+    with _similar_sources_lock:
+        _similar_sources_cache.pop(key, None)
+        while len(_similar_sources_cache) >= SIMILAR_SOURCES_CACHE_SIZE:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del _similar_sources_cache[next(iter(_similar_sources_cache))]
+        _similar_sources_cache[key] = (time.monotonic() + SIMILAR_SOURCES_TTL, sources)
+
+
+def _fetch_window_stats(attack: Attack, window_start: datetime) -> dict:
+    """Fetch same-source window stats and the number of sources behind similar attacks"""
+    key = (
+        attack.vulnerability_type,
+        attack.technique_id,
+        int(attack.timestamp.timestamp() // SIMILAR_SOURCES_TTL),
+    )
+    similar_sources = _cached_similar_sources(key)
+    if similar_sources is not None:
+        stats = query_prepared(
+            "agent_window_recent", _RECENT_ONLY_SQL,
+            (attack.source_ip, window_start, attack.timestamp),
+        )[0]
+        stats["sources"] = similar_sources
+        return stats
+
+    stats = query_prepared("agent_window", _WINDOW_SQL, (
+        attack.source_ip, window_start, attack.timestamp,
+        attack.vulnerability_type, attack.technique_id,
+        attack.vulnerability_type in HOT_VULN_SET,
+    ))[0]
+    if stats["sources"] is not None:
+        _store_similar_sources(key, stats["sources"])
+    return stats
+
+
+_BATCH_RECENT_SQL = """
+    SELECT attacker_id, timestamp, vulnerability_type, base_url
+    FROM vulnerability_logs
+    WHERE attacker_id = ANY(%s) AND timestamp BETWEEN %s AND %s
+    ORDER BY attacker_id, timestamp
+"""
+_BATCH_SIMILAR_SQL = """
+    SELECT vulnerability_type, technique_id, attacker_id, timestamp
+    FROM vulnerability_logs
+    WHERE (vulnerability_type, technique_id) IN %s AND timestamp BETWEEN %s AND %s
+      AND attacker_id <> ''
+    ORDER BY timestamp
+"""
+
+
+def _error_indicators() -> AgentIndicators:
+    """Neutral result reported when an attack cannot be analyzed"""
+    return AgentIndicators(
+        speed_score=0.0,
+        pattern_score=0.0,
+        coordination_score=0.0,
+        overall_agent_probability=0.0,
+        indicators=["Error analyzing attack"]
+    )
+
+
+def _insufficient_history() -> AgentIndicators:
+    """Result for a lone probe that is not worth a coordination check"""
+    return AgentIndicators(
+        speed_score=0.0,
+        pattern_score=0.0,
+        coordination_score=0.0,
+        overall_agent_probability=0.0,
+        indicators=["Insufficient history"]
+    )
+
+
+def _group_by(rows: List[dict], key) -> Dict[Any, Tuple[List[datetime], List[dict]]]:
+    """Group timestamp-ordered rows, keeping a parallel timestamp list per group"""
+    groups: Dict[Any, Tuple[List[datetime], List[dict]]] = {}
+    for row in rows:
+        timestamps, members = groups.setdefault(key(row), ([], []))
+        timestamps.append(row["timestamp"])
+        members.append(row)
+    return groups
+
+
+def _window_stats(rows: List[dict]) -> Tuple[int, Optional[float], int, int]:
+    """Attack count, mean gap in seconds, distinct vulnerabilities and sites of a window"""
+    avg_gap = None
+    if len(rows) > 1:
+        # Rows arrive ordered by timestamp, so the gaps are plain diffs
+        timestamps = np.fromiter(
+            (row["timestamp"].timestamp() for row in rows),
+            dtype=np.float64,
+            count=len(rows),
+        )
+        avg_gap = float(np.diff(timestamps).mean())
+    return (
+        len(rows),
+        avg_gap,
+        len(set(row["vulnerability_type"] for row in rows)),
+        len(set(row["base_url"] for row in rows)),
+    )
+
+
+def _window_slice(group: Tuple[List[datetime], List[dict]], start: datetime, end: datetime) -> List[dict]:
+    """Rows of a group whose timestamp falls in [start, end]"""
+    timestamps, members = group
+    return members[bisect_left(timestamps, start):bisect_right(timestamps, end)]
 
 
 class AgentDetector:
@@ -12,120 +223,143 @@ class AgentDetector:
     
     def analyze_attack(self, attack: Attack) -> AgentIndicators:
         """Analyze a single attack for autonomous agent indicators"""
-        indicators = []
-        
         try:
             # Get recent attacks from same source (last 5 minutes)
             recent_window = attack.timestamp - timedelta(minutes=5)
             
-            # Query Supabase for recent attacks from same source
-            # Format timestamps for Supabase query
-            window_str = recent_window.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            timestamp_str = attack.timestamp.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            
-            response = supabase.table("vulnerability_logs")\
-                .select("*")\
-                .eq("attacker_id", attack.source_ip)\
-                .gte("timestamp", window_str)\
-                .lte("timestamp", timestamp_str)\
-                .order("timestamp")\
-                .execute()
-            
-            recent_logs = response.data if response.data else []
-            
-            # Convert to Attack objects
-            recent_attacks = []
-            for log in recent_logs:
-                try:
-                    recent_attacks.append(Attack.from_vulnerability_log(log))
-                except Exception as e:
-                    print(f"Error converting log to attack: {e}")
-                    continue
-            
-            # Speed analysis: rapid successive attacks
-            speed_score = 0.0
-            if len(recent_attacks) > 1:
-                time_diffs = []
-                for i in range(1, len(recent_attacks)):
-                    diff = (recent_attacks[i].timestamp - recent_attacks[i-1].timestamp).total_seconds()
-                    time_diffs.append(diff)
-                
-                if time_diffs:
-                    avg_time = statistics.mean(time_diffs)
-                    # Very fast attacks (< 1 second) suggest automation
-                    if avg_time < 1.0:
-                        speed_score = 1.0
-                        indicators.append("Extremely rapid attack sequence")
-                    elif avg_time < 5.0:
-                        speed_score = 0.7
-                        indicators.append("Rapid attack sequence")
-                    elif avg_time < 30.0:
-                        speed_score = 0.4
-                        indicators.append("Fast attack sequence")
-            
-            # Pattern analysis: systematic exploration
-            pattern_score = 0.0
-            if len(recent_attacks) > 2:
-                # Check for systematic vulnerability testing
-                vuln_types = [a.vulnerability_type for a in recent_attacks]
-                unique_vulns = len(set(vuln_types))
-                total_attacks = len(vuln_types)
-                
-                # High diversity in short time suggests systematic scanning
-                if unique_vulns / total_attacks > 0.7 and total_attacks > 3:
-                    pattern_score = 0.8
-                    indicators.append("Systematic vulnerability exploration")
-                
-                # Check for methodical website targeting
-                websites = [a.website_url for a in recent_attacks]
-                if len(set(websites)) > 1:
-                    pattern_score = max(pattern_score, 0.6)
-                    indicators.append("Multi-target systematic approach")
-            
-            # Coordination analysis: multiple IPs, similar patterns
-            coordination_score = 0.0
-            # Check for similar attack patterns from different IPs in short time
-            similar_response = supabase.table("vulnerability_logs")\
-                .select("*")\
-                .eq("vulnerability_type", attack.vulnerability_type)\
-                .eq("technique_id", attack.technique_id)\
-                .gte("timestamp", window_str)\
-                .lte("timestamp", timestamp_str)\
-                .execute()
-            
-            similar_logs = similar_response.data if similar_response.data else []
-            unique_ips = len(set([log.get("attacker_id") for log in similar_logs if log.get("attacker_id")]))
-            
-            if unique_ips > 3:
-                coordination_score = 0.7
-                indicators.append("Coordinated multi-source attack pattern")
-            elif unique_ips > 1:
-                coordination_score = 0.4
-                indicators.append("Multiple sources with similar patterns")
-            
-            # Overall probability (weighted combination)
-            overall = (speed_score * 0.3 + pattern_score * 0.4 + coordination_score * 0.3)
+            # Query recent attacks from same source and similar patterns together;
+            # psycopg2 adapts the datetimes to timestamptz parameters directly
+            stats = _fetch_window_stats(attack, recent_window)
+            if stats["attacks"] <= 1 and attack.vulnerability_type not in HOT_VULN_SET:
+                return _insufficient_history()
+            avg_gap = stats["avg_gap"]
+            return self._score(
+                stats["attacks"],
+                float(avg_gap) if avg_gap is not None else None,
+                stats["unique_vulns"],
+                stats["unique_sites"],
+                stats["sources"],
+            )
             
-            if overall > 0.7:
-                indicators.append("High probability of autonomous agent")
-            elif overall > 0.4:
-                indicators.append("Moderate probability of autonomous agent")
+        except Exception as e:
+            print(f"Error in agent detection: {e}")
+            return _error_indicators()
+    
+    async def analyze_attack_async(self, attack: Attack) -> AgentIndicators:
+        """analyze_attack for async endpoints, run in a worker thread
+        
+        The blocking psycopg2 round-trip would otherwise stall the event loop.
+        """
+        return await asyncio.to_thread(self.analyze_attack, attack)
+    
+    async def analyze_attacks_async(self, attacks: List[Attack]) -> List[AgentIndicators]:
+        """analyze_attacks for async endpoints, run in a worker thread"""
+        return await asyncio.to_thread(self.analyze_attacks, attacks)
+    
+    def analyze_attacks(self, attacks: List[Attack]) -> List[AgentIndicators]:
+        """Analyze many attacks with at most two queries for the whole batch
+        
+        Same-source rows are fetched for every source at once and similar-pattern
+        rows for every (vulnerability_type, technique_id) pair still needing a
+        coordination check at once, both over the span covering all windows. Each
+        attack's 5 minute window is then cut out of its group in Python. Results
+        are in the same order as ``attacks``.
+        """
+        if not attacks:
+            return []
+        
+        window = timedelta(minutes=5)
+        try:
+            start = min(a.timestamp for a in attacks) - window
+            end = max(a.timestamp for a in attacks)
             
-            return AgentIndicators(
-                speed_score=speed_score,
-                pattern_score=pattern_score,
-                coordination_score=coordination_score,
-                overall_agent_probability=overall,
-                indicators=indicators if indicators else ["No strong agent indicators"]
+            sources = list({a.source_ip for a in attacks})
+            by_source = _group_by(
+                query_db(_BATCH_RECENT_SQL, (sources, start, end)),
+                lambda row: row["attacker_id"],
             )
+            recent_windows = [
+                _window_slice(by_source.get(a.source_ip, ([], [])), a.timestamp - window, a.timestamp)
+                for a in attacks
+            ]
             
+            # Lone probes outside HOT_VULN_SET are not checked for coordination
+            patterns = tuple({
+                (a.vulnerability_type, a.technique_id)
+                for a, recent_logs in zip(attacks, recent_windows)
+                if len(recent_logs) > 1 or a.vulnerability_type in HOT_VULN_SET
+            })
+            by_pattern = {}
+            if patterns:
+                by_pattern = _group_by(
+                    query_db(_BATCH_SIMILAR_SQL, (patterns, start, end)),
+                    lambda row: (row["vulnerability_type"], row["technique_id"]),
+                )
         except Exception as e:
             print(f"Error in agent detection: {e}")
-            return AgentIndicators(
-                speed_score=0.0,
-                pattern_score=0.0,
-                coordination_score=0.0,
-                overall_agent_probability=0.0,
-                indicators=["Error analyzing attack"]
-            )
-
+            return [_error_indicators() for _ in attacks]
+        
+        empty = ([], [])
+        results = []
+        for attack, recent_logs in zip(attacks, recent_windows):
+            try:
+                if len(recent_logs) <= 1 and attack.vulnerability_type not in HOT_VULN_SET:
+                    results.append(_insufficient_history())
+                    continue
+                similar_logs = _window_slice(
+                    by_pattern.get((attack.vulnerability_type, attack.technique_id), empty),
+                    attack.timestamp - window, attack.timestamp,
+                )
+                # The query already drops empty ids
+                unique_ips = len({log["attacker_id"] for log in similar_logs})
+                results.append(self._score(*_window_stats(recent_logs), unique_ips))
+            except Exception as e:
+                print(f"Error in agent detection: {e}")
+                results.append(_error_indicators())
+        return results
+    
+    def _score(
+        self,
+        total_attacks: int,
+        avg_time: Optional[float],
+        unique_vulns: int,
+        unique_sites: int,
+        unique_ips: int,
+    ) -> AgentIndicators:
+        """Score same-source window stats and a similar-source count"""
+        # Speed analysis: rapid successive attacks; very fast attacks
+        # (< 1 second) suggest automation
+        speed_tier = bisect_right(_SPEED_THRESH, avg_time) if total_attacks > 1 else len(_SPEED_THRESH)
+        
+        # Pattern analysis: systematic exploration. High vulnerability
+        # diversity in short time suggests systematic scanning; several
+        # sites suggest methodical targeting
+        pattern_tier = 0
+        if total_attacks > 2:
+            systematic = total_attacks > 3 and unique_vulns / total_attacks > 0.7
+            pattern_tier = (systematic << 1) | (unique_sites > 1)
+        
+        # Coordination analysis: multiple IPs, similar patterns
+        coord_tier = bisect_left(_COORD_THRESH, unique_ips)
+        
+        speed_score = _SPEED_SCORE[speed_tier]
+        pattern_score = _PATTERN_SCORE[pattern_tier]
+        coordination_score = _COORD_SCORE[coord_tier]
+        
+        # Overall probability (weighted combination)
+        overall = (speed_score * 0.3 + pattern_score * 0.4 + coordination_score * 0.3)
+        
+        indicators = (
+            _SPEED_INDICATORS[speed_tier]
+            + _PATTERN_INDICATORS[pattern_tier]
+            + _COORD_INDICATORS[coord_tier]
+            + _OVERALL_INDICATORS[bisect_left(_OVERALL_THRESH, overall)]
+        )
+        
+        return AgentIndicators(
+            speed_score=speed_score,
+            pattern_score=pattern_score,
+            coordination_score=coordination_score,
+            overall_agent_probability=overall,
+            indicators=list(indicators or _NO_INDICATORS)
+        )
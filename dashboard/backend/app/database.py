@@ -1,14 +1,20 @@
 """Database connection to Supabase using direct PostgreSQL connection"""
 import os
+import re
+import threading
+import weakref
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 from contextlib import contextmanager
 from dotenv import load_dotenv
 from typing import Optional
 
 load_dotenv()
 
+# Project ref in a Supabase project URL: https://xxxxx.supabase.co
+_SUPABASE_HOST_RE = re.compile(r"https://([^.]+)\.supabase\.co")
+
 def get_env(key: str) -> str | None:
     """Get environment variable, returning None if empty or not set"""
     value = os.getenv(key)
@@ -30,8 +36,7 @@ if not DATABASE_URL:
     supabase_url = get_env("SUPABASE_URL")
     if supabase_url and db_user and db_password:
         # Extract project ref from URL: https://xxxxx.supabase.co
-        import re
-        match = re.search(r'https://([^.]+)\.supabase\.co', supabase_url)
+        match = _SUPABASE_HOST_RE.search(supabase_url)
         if match:
             project_ref = match.group(1)
             db_host = db_host or f"{project_ref}.supabase.co"
@@ -48,9 +53,9 @@ if not DATABASE_URL:
             "Use the 'Connection pooling' or 'Direct connection' string."
         )
 
-# Create connection pool
+# Create connection pool (thread-safe: FastAPI runs sync endpoints in a threadpool)
 try:
-    pool = SimpleConnectionPool(1, 20, DATABASE_URL)
+    pool = ThreadedConnectionPool(1, 20, DATABASE_URL)
 except Exception as e:
     raise ValueError(
         f"Failed to create database connection pool: {str(e)}. "
@@ -77,6 +82,40 @@ def query_db(query: str, params: Optional[tuple] = None):
             cur.execute(query, params)
             return cur.fetchall()
 
+# Server-side prepared statements for hot queries. Transaction-mode poolers
+# (PgBouncer, Supabase's pooler on port 6543) don't keep them between
+# transactions, so set DB_PREPARE_STATEMENTS=false when connecting through one.
+PREPARE_STATEMENTS = (get_env("DB_PREPARE_STATEMENTS") or "true").lower() not in ("0", "false", "no")
+_NUMBERED_PARAM = re.compile(r"\$(\d+)")
+_prepared_names: "weakref.WeakKeyDictionary[object, set]" = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+def query_prepared(name: str, statement: str, params: tuple):
+    """Execute a SELECT written with $1..$n placeholders as a prepared statement
+    
+    The statement is PREPAREd the first time each pooled connection runs it and
+    EXECUTEd by name after that, so Postgres parses and plans it once per session.
+    With DB_PREPARE_STATEMENTS disabled it runs as an ordinary query instead.
+    """
+    with get_db() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if not PREPARE_STATEMENTS:
+                cur.execute(
+                    _NUMBERED_PARAM.sub("%s", statement),
+                    tuple(params[int(n) - 1] for n in _NUMBERED_PARAM.findall(statement)),
+                )
+                return cur.fetchall()
+            
+            with _prepared_lock:
+                names = _prepared_names.setdefault(conn, set())
+            if name not in names:
+                # PREPARE is session state, not transactional, so it survives
+                # a later rollback on this connection
+                cur.execute(f"PREPARE {name} AS {statement}")
+                names.add(name)
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+            return cur.fetchall()
+
 # For compatibility with existing code that uses supabase.table()
 class SupabaseTableProxy:
     """Proxy object to mimic supabase.table() interface using direct PostgreSQL"""
@@ -89,8 +128,8 @@ class SupabaseTableProxy:
     def insert(self, data: dict):
         """Insert data into table"""
         columns = list(data.keys())
-        placeholders = [f"${i+1}" for i in range(len(columns))]
-        query = f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
+        placeholders = ", ".join(["%s"] * len(columns))
+        query = f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({placeholders}) RETURNING *"
         with get_db() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute(query, tuple(data.values()))
@@ -113,17 +152,14 @@ class SupabaseQueryBuilder:
         self.delete = delete
         self.conditions = []
         self.params = []
-        self.param_counter = 1
         self.order_by = None
         self.limit_val = None
         self.offset_val = None
         self.range_val = None
     
     def eq(self, column: str, value):
-        placeholder = f"${self.param_counter}"
-        self.conditions.append(f"{column} = {placeholder}")
+        self.conditions.append(f"{column} = %s")
         self.params.append(value)
-        self.param_counter += 1
         return self
     
     def is_null(self, column: str, null: bool = True):
@@ -136,24 +172,18 @@ class SupabaseQueryBuilder:
     
     def neq(self, column: str, value):
         """Not equal condition"""
-        placeholder = f"${self.param_counter}"
-        self.conditions.append(f"{column} != {placeholder}")
+        self.conditions.append(f"{column} != %s")
         self.params.append(value)
-        self.param_counter += 1
         return self
     
     def gte(self, column: str, value):
-        placeholder = f"${self.param_counter}"
-        self.conditions.append(f"{column} >= {placeholder}")
+        self.conditions.append(f"{column} >= %s")
         self.params.append(value)
-        self.param_counter += 1
         return self
     
     def lte(self, column: str, value):
-        placeholder = f"${self.param_counter}"
-        self.conditions.append(f"{column} <= {placeholder}")
+        self.conditions.append(f"{column} <= %s")
         self.params.append(value)
-        self.param_counter += 1
         return self
     
     def order(self, column: str, desc: bool = False):
@@ -173,51 +203,58 @@ class SupabaseQueryBuilder:
         self.limit_val = end - start + 1
         return self
     
-    def execute(self):
-        """Execute the query"""
+    def _build_query(self):
+        """Build the SQL statement and its parameters"""
         where_clause = f" WHERE {' AND '.join(self.conditions)}" if self.conditions else ""
         order_clause = f" ORDER BY {self.order_by}" if self.order_by else ""
         limit_clause = f" LIMIT {self.limit_val}" if self.limit_val else ""
         offset_clause = f" OFFSET {self.offset_val}" if self.offset_val else ""
         
-        # Build query and collect all parameters
+        # Collect parameters in the order their %s appear
         all_params = list(self.params)
         
         if self.delete:
             query = f"DELETE FROM {self.table_name}{where_clause} RETURNING *"
         elif self.update_data:
-            # Add update params after where clause params
-            update_params_start = len(self.params) + 1
-            set_clause = ", ".join([f"{k} = ${update_params_start + i}" for i, k in enumerate(self.update_data.keys())])
-            all_params.extend(list(self.update_data.values()))
+            # SET placeholders come before the WHERE ones in the statement
+            set_clause = ", ".join([f"{k} = %s" for k in self.update_data.keys()])
+            all_params = list(self.update_data.values()) + all_params
             query = f"UPDATE {self.table_name} SET {set_clause}{where_clause} RETURNING *"
         else:
             query = f"SELECT {self.columns} FROM {self.table_name}{where_clause}{order_clause}{limit_clause}{offset_clause}"
         
+        # Without params psycopg2 leaves the query untouched, so a
+        # literal % is only special when there is something to bind
+        return query, tuple(all_params) or None
+    
+    def execute(self):
+        """Execute the query"""
+        query, params = self._build_query()
+        
         with get_db() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Must pass params if query has placeholders ($1, $2, etc.)
-                has_placeholders = "$" in query
-                if has_placeholders and all_params:
-                    cur.execute(query, tuple(all_params))
-                elif has_placeholders and not all_params:
-                    # Query has placeholders but no params - this is an error
-                    error_msg = f"Query has placeholders but no params provided. Query: {query[:150]}... Conditions: {self.conditions}"
-                    print(f"ERROR: {error_msg}")
-                    raise ValueError(error_msg)
-                else:
-                    # No placeholders, safe to execute without params
-                    cur.execute(query)
-                
-                if self.delete or self.update_data:
-                    conn.commit()
-                    result = cur.fetchall()
-                else:
-                    result = cur.fetchall()
+                cur.execute(query, params)
+                # RealDictRow is a dict subclass, so the rows are returned as-is
+                data = cur.fetchall()
         
-        # Convert RealDictRow to regular dict
-        data = [dict(row) for row in result]
         return type('Response', (), {'data': data})()
+    
+    def execute_iter(self, batch: int = 1000):
+        """Stream SELECT results through a server-side cursor
+        
+        Rows are pulled from Postgres ``batch`` at a time, so memory stays bounded
+        however large the result is. The pooled connection is held until the
+        generator is exhausted or closed.
+        """
+        if self.delete or self.update_data:
+            raise ValueError("execute_iter only supports SELECT queries")
+        query, params = self._build_query()
+        
+        with get_db() as conn:
+            with conn.cursor(name="supabase_stream", cursor_factory=RealDictCursor) as cur:
+                cur.itersize = batch
+                cur.execute(query, params)
+                yield from cur
 
 # Create a supabase-like client interface
 class SupabaseClient:
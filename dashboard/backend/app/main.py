@@ -1,17 +1,25 @@
 """FastAPI main application"""
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from pathlib import Path
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import uvicorn
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import json
 from datetime import datetime, timedelta
 import asyncio
+from collections import defaultdict
 
-from app.database import supabase
+# Optional orjson for response and websocket encoding (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.database import supabase, query_db
 from app.models import Attack
 from app.schemas import (
     AttackResponse, 
@@ -44,31 +52,71 @@ from app.trajectory_schemas import (
 )
 from app.trajectory_classifier import trajectory_classifier
 
+def dumps_message(message: Any) -> str:
+    """Encode a websocket message as compact JSON text, matching send_json's output"""
+    if orjson is not None:
+        # orjson emits datetimes as ISO 8601 and numpy values natively
+        return orjson.dumps(
+            message, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
 # Global connections manager for WebSockets
 class ConnectionManager:
+    # Messages buffered per client; a client that falls this far behind is dropped
+    QUEUE_SIZE = 32
+    # A send slower than this drops the client
+    SEND_TIMEOUT = 5.0
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # Each connection has its own outbound queue drained by a relay task,
+        # so a slow client only ever delays itself
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
+        self._relays: Dict[WebSocket, asyncio.Task] = {}
+        self._closing: set = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.active_connections[websocket] = queue
+        self._relays[websocket] = asyncio.create_task(self._relay(websocket, queue))
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.pop(websocket, None)
+        relay = self._relays.pop(websocket, None)
+        if relay is not None and relay is not asyncio.current_task():
+            relay.cancel()
+
+    async def _relay(self, websocket: WebSocket, queue: asyncio.Queue):
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_text(payload), timeout=self.SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error broadcasting to connection: {e}")
+            self.disconnect(websocket)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            # 1013: try again later
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
     async def broadcast(self, message: dict):
-        disconnected = []
-        for connection in self.active_connections:
+        # Encode once and hand the same text to every connection's queue
+        payload = dumps_message(message)
+        for connection, queue in list(self.active_connections.items()):
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected connections
-        for conn in disconnected:
-            self.disconnect(conn)
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                print("Dropping websocket client that is not keeping up with broadcasts")
+                self.disconnect(connection)
+                task = asyncio.create_task(self._close(connection))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
 
 manager = ConnectionManager()
 forecaster = RiskForecaster()
@@ -81,6 +129,12 @@ except Exception as e:
     print(f"Warning: Could not initialize MITRE risk engine: {e}")
     mitre_risk_engine = None
 
+@lru_cache(maxsize=None)
+def get_advanced_forecaster():
+    """Shared AdvancedRiskForecaster, built on first use so its projection cache outlives a request"""
+    from app.advanced_forecasting import AdvancedRiskForecaster
+    return AdvancedRiskForecaster()
+
 # agent_detector = AgentDetector()  # Disabled for now
 
 # Background task for polling Supabase and broadcasting updates
@@ -114,7 +168,8 @@ app = FastAPI(
     title="AI Cyber Attack Monitoring Dashboard API",
     description="Real-time monitoring and risk forecasting for AI cyber attacks",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # CORS middleware
@@ -234,13 +289,20 @@ async def get_stats(include_synthetic: bool = False):
         from datetime import timezone
         now = datetime.now(timezone.utc)
         
-        # Get all attacks
-        query = supabase.table("vulnerability_logs")\
-            .select("*")
+        # Get all attacks, with only the columns Attack.from_vulnerability_log
+        # reads and the synthetic filter applied in SQL. The breakdowns below
+        # span the whole table, so it can't be narrowed to a time window.
+        query = (
+            "SELECT id, timestamp, base_url, vulnerability_type, technique_id, "
+            "success, attacker_id, session_id FROM vulnerability_logs"
+        )
+        if not include_synthetic:
+            query += " WHERE is_synthetic IS NOT TRUE"
         
-        all_response = query.execute()
+        # psycopg2 blocks, so keep it off the event loop
+        filtered_data = await asyncio.to_thread(query_db, query)
         
-        if not all_response.data:
+        if not filtered_data:
             return StatsResponse(
                 total_attacks=0,
                 attacks_24h=0,
@@ -258,14 +320,6 @@ async def get_stats(include_synthetic: bool = False):
                 technique_stats=[]
             )
         
-        # Filter synthetic data if requested
-        filtered_data = all_response.data
-        if not include_synthetic:
-            filtered_data = [
-                log for log in filtered_data 
-                if log.get("is_synthetic") is None or log.get("is_synthetic") is False
-            ]
-        
         # Convert to Attack objects
         all_attacks = []
         for log_data in filtered_data:
@@ -279,102 +333,81 @@ async def get_stats(include_synthetic: bool = False):
                 print(f"Error converting log: {e}")
                 continue
         
-        # Time windows - normalize timestamps for comparison
-        def normalize_datetime(dt):
-            """Ensure datetime is timezone-aware"""
-            if dt.tzinfo is None:
-                return dt.replace(tzinfo=timezone.utc)
-            return dt
-        
+        # Single pass over all attacks. Timestamps are timezone-aware after
+        # the conversion above, so they compare directly.
         time_24h_ago = now - timedelta(hours=24)
         time_7d_ago = now - timedelta(days=7)
         time_30d_ago = now - timedelta(days=30)
+        one_us = timedelta(microseconds=1)
+        us_per_hour = 3600 * 1_000_000
+        
+        attacks_24h = attacks_7d = attacks_30d = 0
+        successful_count = 0
+        successful_vulns = set()
+        failed_vulns = set()
+        attack_vector_counts: Dict[str, int] = defaultdict(int)
+        # [total, successful] per key, in first-seen order
+        website_counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        vuln_counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        technique_counts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        # hourly_counts[i] covers [now - (i+1)h, now - i h)
+        hourly_counts = [0] * 24
         
-        attacks_24h = [a for a in all_attacks if normalize_datetime(a.timestamp) >= time_24h_ago]
-        attacks_7d = [a for a in all_attacks if normalize_datetime(a.timestamp) >= time_7d_ago]
-        attacks_30d = [a for a in all_attacks if normalize_datetime(a.timestamp) >= time_30d_ago]
-        
-        # Successful vs failed
-        successful_attacks = [a for a in all_attacks if a.success]
-        failed_attacks = [a for a in all_attacks if not a.success]
-        
-        # Websites attacked
-        websites_attacked = len(set(a.website_url for a in all_attacks))
-        
-        # Vulnerabilities
-        successful_vulns = set(a.vulnerability_type for a in successful_attacks)
-        failed_vulns = set(a.vulnerability_type for a in failed_attacks)
-        
-        # Attack vectors (derived from vulnerability types)
-        attack_vector_counts: Dict[str, int] = {}
         for attack in all_attacks:
-            vector = attack.attack_vector or attack.vulnerability_type
-            attack_vector_counts[vector] = attack_vector_counts.get(vector, 0) + 1
+            ts = attack.timestamp
+            if ts >= time_30d_ago:
+                attacks_30d += 1
+                if ts >= time_7d_ago:
+                    attacks_7d += 1
+                    if ts >= time_24h_ago:
+                        attacks_24h += 1
+                        age_us = (now - ts) // one_us
+                        if age_us > 0:
+                            hourly_counts[(age_us - 1) // us_per_hour] += 1
+            
+            success = attack.success
+            if success:
+                successful_count += 1
+                successful_vulns.add(attack.vulnerability_type)
+            else:
+                failed_vulns.add(attack.vulnerability_type)
+            
+            # Attack vectors (derived from vulnerability types)
+            attack_vector_counts[attack.attack_vector or attack.vulnerability_type] += 1
+            
+            for counts in (
+                website_counts[attack.website_url],
+                vuln_counts[attack.vulnerability_type],
+                technique_counts[attack.technique_id],
+            ):
+                counts[0] += 1
+                counts[1] += success
         
         attack_vectors = [{"vector": k, "count": v} for k, v in attack_vector_counts.items()]
-        
-        # Website stats
-        website_counts: Dict[str, Dict[str, int]] = {}
-        for attack in all_attacks:
-            if attack.website_url not in website_counts:
-                website_counts[attack.website_url] = {"total": 0, "successful": 0}
-            website_counts[attack.website_url]["total"] += 1
-            if attack.success:
-                website_counts[attack.website_url]["successful"] += 1
-        
-        website_stats = [{"url": k, "total": v["total"], "successful": v["successful"]} 
+        website_stats = [{"url": k, "total": v[0], "successful": v[1]} 
                         for k, v in website_counts.items()]
-        
-        # Vulnerability stats
-        vuln_counts: Dict[str, Dict[str, int]] = {}
-        for attack in all_attacks:
-            if attack.vulnerability_type not in vuln_counts:
-                vuln_counts[attack.vulnerability_type] = {"total": 0, "successful": 0}
-            vuln_counts[attack.vulnerability_type]["total"] += 1
-            if attack.success:
-                vuln_counts[attack.vulnerability_type]["successful"] += 1
-        
-        vulnerability_stats = [{"type": k, "total": v["total"], "successful": v["successful"]} 
+        vulnerability_stats = [{"type": k, "total": v[0], "successful": v[1]} 
                               for k, v in vuln_counts.items()]
-        
-        # Technique stats
-        technique_counts: Dict[str, Dict[str, int]] = {}
-        for attack in all_attacks:
-            if attack.technique_id not in technique_counts:
-                technique_counts[attack.technique_id] = {"total": 0, "successful": 0}
-            technique_counts[attack.technique_id]["total"] += 1
-            if attack.success:
-                technique_counts[attack.technique_id]["successful"] += 1
-        
-        technique_stats = [{"technique_id": k, "total": v["total"], "successful": v["successful"]} 
+        technique_stats = [{"technique_id": k, "total": v[0], "successful": v[1]} 
                           for k, v in technique_counts.items()]
+        websites_attacked = len(website_counts)
         
-        # Time series (last 24 hours, hourly buckets)
-        time_series = []
-        def normalize_datetime(dt):
-            """Ensure datetime is timezone-aware"""
-            if dt.tzinfo is None:
-                return dt.replace(tzinfo=timezone.utc)
-            return dt
-        
-        for i in range(24):
-            hour_start = now - timedelta(hours=i+1)
-            hour_end = now - timedelta(hours=i)
-            hour_attacks = [a for a in all_attacks 
-                          if hour_start <= normalize_datetime(a.timestamp) < hour_end]
-            time_series.append({
-                "timestamp": hour_start.isoformat(),
-                "count": len(hour_attacks)
-            })
-        time_series.reverse()
+        # Time series (last 24 hours, hourly buckets, oldest first)
+        time_series = [
+            {
+                "timestamp": (now - timedelta(hours=i + 1)).isoformat(),
+                "count": hourly_counts[i]
+            }
+            for i in range(23, -1, -1)
+        ]
         
         return StatsResponse(
             total_attacks=len(all_attacks),
-            attacks_24h=len(attacks_24h),
-            attacks_7d=len(attacks_7d),
-            attacks_30d=len(attacks_30d),
-            successful_attacks=len(successful_attacks),
-            failed_attacks=len(failed_attacks),
+            attacks_24h=attacks_24h,
+            attacks_7d=attacks_7d,
+            attacks_30d=attacks_30d,
+            successful_attacks=successful_count,
+            failed_attacks=len(all_attacks) - successful_count,
             websites_attacked=websites_attacked,
             successful_vulnerabilities=list(successful_vulns),
             failed_vulnerabilities=list(failed_vulns),
@@ -411,10 +444,9 @@ async def get_advanced_risk_forecast(include_synthetic: bool = False):
         include_synthetic: If False, exclude synthetic data (is_synthetic = TRUE)
     """
     try:
-        from app.advanced_forecasting import AdvancedRiskForecaster
         from datetime import timezone
         
-        advanced_forecaster = AdvancedRiskForecaster()
+        advanced_forecaster = get_advanced_forecaster()
         
         # Get all attacks
         all_response = supabase.table("vulnerability_logs")\
@@ -470,18 +502,18 @@ async def get_advanced_risk_forecast(include_synthetic: bool = False):
         
         # Statistical analysis summary
         import pandas as pd
+        import numpy as np
         if all_attacks:
-            df = pd.DataFrame([{
-                'timestamp': a.timestamp,
-                'success': 1 if a.success else 0,
-                'technique_id': a.technique_id
-            } for a in all_attacks])
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            # Build the columns directly rather than a dict per attack
+            df = pd.DataFrame({
+                'timestamp': [a.timestamp for a in all_attacks],
+                'success': np.fromiter((a.success for a in all_attacks), dtype=np.int64, count=len(all_attacks)),
+                'technique_id': [a.technique_id for a in all_attacks]
+            })
             
             now = datetime.now(timezone.utc)
             recent_7d = df[df['timestamp'] >= (now - timedelta(days=7))]
             
-            import numpy as np
             daily_counts = recent_7d.groupby(recent_7d['timestamp'].dt.date).size()
             mean_attacks = float(daily_counts.mean()) if len(daily_counts) > 0 else 0.0
             std_attacks = float(daily_counts.std()) if len(daily_counts) > 1 else 0.0
@@ -1635,9 +1667,9 @@ async def websocket_endpoint(websocket: WebSocket):
             try:
                 message = json.loads(data) if data else {}
                 # Echo back or handle commands
-                await websocket.send_json({"type": "pong", "data": message})
+                await websocket.send_text(dumps_message({"type": "pong", "data": message}))
             except json.JSONDecodeError:
-                await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+                await websocket.send_text(dumps_message({"type": "error", "message": "Invalid JSON"}))
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
@@ -0,0 +1,14 @@
+-- Migration: Add covering indexes for agent detection lookups
+-- Created: 2026-10-16
+-- Description: Lets both halves of AgentDetector's window query run as index-only scans
+-- Note: CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run each statement on its own
+
+-- Same-source window: attacker_id = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vulnerability_logs_attacker_id_timestamp
+ON vulnerability_logs(attacker_id, timestamp)
+INCLUDE (vulnerability_type, base_url);
+
+-- Similar-pattern window: vulnerability_type = ? AND technique_id = ? AND timestamp >= ? (batch scoring adds <= ?)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vulnerability_logs_type_technique_timestamp
+ON vulnerability_logs(vulnerability_type, technique_id, timestamp)
+INCLUDE (attacker_id);